@@ -0,0 +1,44 @@
+"""meeting times as minutes
+
+Revision ID: 3f1e6b2a9c47
+Revises: d8b49997d4b7
+Create Date: 2026-10-15 12:02:17.385940
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f1e6b2a9c47'
+down_revision = 'd8b49997d4b7'
+branch_labels = None
+depends_on = None
+
+
+# sqlalchemy's Interval is stored on mysql as a DATETIME offset from the epoch
+EPOCH = "'1970-01-01 00:00:00'"
+
+
+def upgrade():
+    op.add_column('meetings', sa.Column('start_time_minutes', sa.SmallInteger(), nullable=True))
+    op.add_column('meetings', sa.Column('duration_minutes', sa.SmallInteger(), nullable=True))
+    op.execute(f"UPDATE meetings SET start_time_minutes = HOUR(start_time) * 60 + MINUTE(start_time), duration_minutes = TIMESTAMPDIFF(MINUTE, {EPOCH}, duration)")
+    op.drop_column('meetings', 'start_time')
+    op.drop_column('meetings', 'duration')
+    op.alter_column('meetings', 'start_time_minutes', existing_type=sa.SmallInteger(), nullable=False)
+    op.alter_column('meetings', 'duration_minutes', existing_type=sa.SmallInteger(), nullable=False)
+    op.create_check_constraint('ck_meetings_start_time_minutes', 'meetings', 'start_time_minutes BETWEEN 0 AND 1439')
+    op.create_check_constraint('ck_meetings_duration_minutes', 'meetings', 'duration_minutes >= 0')
+
+
+def downgrade():
+    op.drop_constraint('ck_meetings_duration_minutes', 'meetings', type_='check')
+    op.drop_constraint('ck_meetings_start_time_minutes', 'meetings', type_='check')
+    op.add_column('meetings', sa.Column('start_time', sa.Time(), nullable=True))
+    op.add_column('meetings', sa.Column('duration', sa.DateTime(), nullable=True))
+    op.execute(f"UPDATE meetings SET start_time = SEC_TO_TIME(start_time_minutes * 60), duration = TIMESTAMPADD(MINUTE, duration_minutes, {EPOCH})")
+    op.drop_column('meetings', 'start_time_minutes')
+    op.drop_column('meetings', 'duration_minutes')
+    op.alter_column('meetings', 'start_time', existing_type=sa.Time(), nullable=False)
+    op.alter_column('meetings', 'duration', existing_type=sa.DateTime(), nullable=False)
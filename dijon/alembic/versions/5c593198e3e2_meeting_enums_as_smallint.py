@@ -0,0 +1,54 @@
+"""meeting enums as smallint
+
+Revision ID: 5c593198e3e2
+Revises: acc395b1e26f
+Create Date: 2026-10-15 10:41:09.226581
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5c593198e3e2'
+down_revision = 'acc395b1e26f'
+branch_labels = None
+depends_on = None
+
+
+DAYS = ['SUNDAY', 'MONDAY', 'TUESDAY', 'WEDNESDAY', 'THURSDAY', 'FRIDAY', 'SATURDAY']
+VENUE_TYPES = ['NONE', 'IN_PERSON', 'VIRTUAL', 'HYBRID']
+
+
+def _case(column, names, start):
+    whens = " ".join(f"WHEN '{name}' THEN {i}" for i, name in enumerate(names, start=start))
+    return f"CASE {column} {whens} END"
+
+
+def _reverse_case(column, names, start):
+    whens = " ".join(f"WHEN {i} THEN '{name}'" for i, name in enumerate(names, start=start))
+    return f"CASE {column} {whens} END"
+
+
+def upgrade():
+    op.add_column('meetings', sa.Column('day_int', sa.SmallInteger(), nullable=True))
+    op.add_column('meetings', sa.Column('venue_type_int', sa.SmallInteger(), nullable=True))
+    op.execute(f"UPDATE meetings SET day_int = {_case('day', DAYS, 1)}, venue_type_int = {_case('venue_type', VENUE_TYPES, 0)}")
+    op.drop_column('meetings', 'day')
+    op.drop_column('meetings', 'venue_type')
+    op.alter_column('meetings', 'day_int', new_column_name='day', existing_type=sa.SmallInteger(), nullable=False)
+    op.alter_column('meetings', 'venue_type_int', new_column_name='venue_type', existing_type=sa.SmallInteger(), nullable=False)
+    op.create_check_constraint('ck_meetings_day', 'meetings', 'day BETWEEN 1 AND 7')
+    op.create_check_constraint('ck_meetings_venue_type', 'meetings', 'venue_type BETWEEN 0 AND 3')
+
+
+def downgrade():
+    op.drop_constraint('ck_meetings_venue_type', 'meetings', type_='check')
+    op.drop_constraint('ck_meetings_day', 'meetings', type_='check')
+    op.add_column('meetings', sa.Column('day_enum', sa.Enum(*DAYS, name='dayofweekenum'), nullable=True))
+    op.add_column('meetings', sa.Column('venue_type_enum', sa.Enum(*VENUE_TYPES, name='venuetypeenum'), nullable=True))
+    op.execute(f"UPDATE meetings SET day_enum = {_reverse_case('day', DAYS, 1)}, venue_type_enum = {_reverse_case('venue_type', VENUE_TYPES, 0)}")
+    op.drop_column('meetings', 'day')
+    op.drop_column('meetings', 'venue_type')
+    op.alter_column('meetings', 'day_enum', new_column_name='day', existing_type=sa.Enum(*DAYS, name='dayofweekenum'), nullable=False)
+    op.alter_column('meetings', 'venue_type_enum', new_column_name='venue_type', existing_type=sa.Enum(*VENUE_TYPES, name='venuetypeenum'), nullable=False)
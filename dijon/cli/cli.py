@@ -25,8 +25,9 @@ def ping():
 @cli.command()
 @click.option("--host", default="127.0.0.1")
 @click.option("--port", default=8000)
-def run_api(host: str, port: int):
-    uvicorn.run("dijon.main:app", host=host, port=port)
+@click.option("--workers", default=1)
+def run_api(host: str, port: int, workers: int):
+    uvicorn.run("dijon.main:app", host=host, port=port, workers=workers, access_log=False)
 
 
 @cli.command()
@@ -41,6 +42,7 @@ def run_migrations():
 @cli.command()
 @click.option("--root-server-id", default=0, show_default=False)
 def run_snapshot(root_server_id: int):
+    failed = False
     with database.db_context() as db:
         if root_server_id:
             root_server = crud.get_root_server(db, root_server_id)
@@ -51,9 +53,18 @@ def run_snapshot(root_server_id: int):
         else:
             root_servers = crud.get_root_servers(db)
 
+        # everything is committed in one transaction when the context exits, and each root server gets a
+        # savepoint so that a failure only throws away that server's snapshot
         for root_server in root_servers:
-            snapshot.create_snapshot(db, root_server)
-            db.commit()
+            try:
+                with db.begin_nested():
+                    snapshot.create_snapshot(db, root_server)
+            except Exception:
+                logging.exception(f"Error: failed to create snapshot for root_server {root_server.id}")
+                failed = True
+
+    if failed:
+        sys.exit(1)
 
 
 if __name__ == "__main__":
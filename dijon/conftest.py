@@ -1,22 +1,37 @@
+import os
+
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import Session, sessionmaker
-from sqlalchemy_utils import create_database, database_exists, drop_database
+from sqlalchemy.pool import StaticPool
+from sqlalchemy_utils import create_database, database_exists
 
+from dijon import crud
 from dijon.database import Base
 from dijon.dependencies import get_db
 from dijon.main import app
+from dijon.models import Snapshot
 from dijon.settings import settings
+from dijon.snapshot import SnapshotCache
 
 
 def get_db_url():
+    # TESTDBURL swaps in another database for a quick local run, e.g. "sqlite://" for in-memory SQLite.
+    # MySQL stays the default since the migrations and check constraints are written for it.
+    test_db_url = settings.get("TESTDBURL")
+    if test_db_url:
+        return test_db_url
     db_user = settings.get("DBUSER", "root")
     db_pass = settings.get("DBPASSWORD", "dijon")
     db_host = settings.get("DBHOST", "0.0.0.0")
     db_port = settings.get("DBPORT", 3306)
     db_name = settings.get("DBNAME", "dijontest")
-    return f"mysql+mysqlconnector://{db_user}:{db_pass}@{db_host}:{db_port}/{db_name}"
+    # under pytest-xdist each worker gets its own database so parallel modules don't share tables
+    worker = os.environ.get("PYTEST_XDIST_WORKER")
+    if worker:
+        db_name = f"{db_name}_{worker}"
+    return f"mysql+mysqldb://{db_user}:{db_pass}@{db_host}:{db_port}/{db_name}"
 
 
 class Ctx:
@@ -27,29 +42,94 @@ class Ctx:
 
 @pytest.fixture(scope="session")
 def engine():
-    engine = create_engine(get_db_url())
-    if database_exists(engine.url):
-        drop_database(engine.url)
-    create_database(engine.url)
+    db_url = get_db_url()
+    if db_url.startswith("sqlite"):
+        # a single shared connection, so an in-memory database is seen by every session and the TestClient
+        engine = create_engine(db_url, connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    else:
+        engine = create_engine(db_url)
+    # Reuse the test database between runs, but rebuild its tables so they always match the models.
+    if not database_exists(engine.url):
+        create_database(engine.url)
+    Base.metadata.drop_all(bind=engine)
     Base.metadata.create_all(bind=engine)
     yield engine
 
 
+@pytest.fixture(scope="module")
+def connection(engine):
+    # Each test module runs inside one transaction that is always rolled back, so rows seeded by
+    # module-scoped fixtures through module_db are shared by the module's tests and then thrown away.
+    connection = engine.connect()
+    transaction = connection.begin()
+    try:
+        yield connection
+    finally:
+        transaction.rollback()
+        connection.close()
+
+
+@pytest.fixture(scope="module")
+def module_db(connection):
+    session = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=connection)()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
 @pytest.fixture
-def db(engine):
-    session = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+def db(connection):
+    # Run each test inside a SAVEPOINT that is always rolled back. The session works in a nested
+    # SAVEPOINT that is reopened whenever the session commits or rolls back, so tests can do either
+    # without ending the test's SAVEPOINT.
+    test_transaction = connection.begin_nested()
+    session = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=connection)()
+    nested = connection.begin_nested()
+
+    @event.listens_for(session, "after_transaction_end")
+    def restart_savepoint(session, trans):
+        nonlocal nested
+        if not nested.is_active:
+            nested = connection.begin_nested()
+
     try:
         yield session
     finally:
-        session.rollback()
+        event.remove(session, "after_transaction_end", restart_savepoint)
         session.close()
+        if nested.is_active:
+            nested.rollback()
+        test_transaction.rollback()
+
+
+@pytest.fixture(scope="session")
+def client():
+    with TestClient(app) as client:
+        yield client
 
 
 @pytest.fixture
-def ctx(db: Session):
-    client = TestClient(app)
+def ctx(db: Session, client: TestClient):
+    app.dependency_overrides[get_db] = lambda: (yield db)
     try:
-        app.dependency_overrides[get_db] = lambda: (yield db)
         yield Ctx(db, client)
     finally:
-        app.dependency_overrides[get_db] = get_db
+        app.dependency_overrides.pop(get_db, None)
+
+
+@pytest.fixture(scope="module")
+def snapshot_1_id(module_db: Session) -> int:
+    # seeded once for the whole module, each test reads it back into its own session
+    root_server = crud.create_root_server(module_db, "root name", "https://blah/main_server/")
+    return crud.create_snapshot(module_db, root_server).id
+
+
+@pytest.fixture
+def snapshot_1(db: Session, snapshot_1_id: int) -> Snapshot:
+    return db.get(Snapshot, snapshot_1_id)
+
+
+@pytest.fixture
+def cache(db: Session, snapshot_1: Snapshot) -> SnapshotCache:
+    return SnapshotCache(db, snapshot_1)
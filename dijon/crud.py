@@ -1,10 +1,13 @@
-from typing import Optional
+from typing import Any, Optional, TypeVar
 
+from sqlalchemy import bindparam, delete, insert, select, tuple_, update
 from sqlalchemy.orm import Session
 
 from dijon.models import (
     Format,
     FormatNawsCode,
+    Meeting,
+    MeetingFormat,
     MeetingNawsCode,
     RootServer,
     ServiceBody,
@@ -13,6 +16,9 @@ from dijon.models import (
 )
 
 
+NawsCodeT = TypeVar("NawsCodeT", ServiceBodyNawsCode, FormatNawsCode, MeetingNawsCode)
+
+
 def create_snapshot(db: Session, root_server: RootServer) -> Snapshot:
     snapshot = Snapshot(root_server_id=root_server.id)
     db.add(snapshot)
@@ -50,6 +56,18 @@ def create_service_body(
     return service_body
 
 
+def create_service_bodies_bulk(db: Session, rows: list[dict[str, Any]]):
+    if rows:
+        db.execute(insert(ServiceBody), rows)
+
+
+def update_service_body_parents(db: Session, rows: list[dict[str, int]]):
+    # rows are dicts of b_id and b_parent_id, executed as a single executemany
+    if rows:
+        stmt = update(ServiceBody).where(ServiceBody.id == bindparam("b_id")).values(parent_id=bindparam("b_parent_id"))
+        db.execute(stmt, rows)
+
+
 def create_format(db: Session, snapshot_id: int, bmlt_id: int, key_string: str, name: str = None, world_id: str = None) -> Format:
     format = Format(
         snapshot_id=snapshot_id,
@@ -64,6 +82,36 @@ def create_format(db: Session, snapshot_id: int, bmlt_id: int, key_string: str,
     return format
 
 
+def create_formats_bulk(db: Session, rows: list[dict[str, Any]]):
+    if rows:
+        db.execute(insert(Format), rows)
+
+
+def create_meetings_bulk(db: Session, rows: list[dict[str, Any]]):
+    if rows:
+        db.execute(insert(Meeting), rows)
+
+
+def create_meeting_formats_by_bmlt_ids(db: Session, snapshot_id: int, bmlt_id_pairs: list[tuple[int, int]]):
+    # bmlt_id_pairs are (meeting bmlt_id, format bmlt_id), resolved to ids by the database in an INSERT ... SELECT
+    # a repeated pair is only matched once within a chunk, so drop repeats before they can land in two chunks
+    bmlt_id_pairs = list(dict.fromkeys(bmlt_id_pairs))
+    for i in range(0, len(bmlt_id_pairs), 1000):
+        chunk = bmlt_id_pairs[i:i + 1000]
+        meeting_formats = (
+            select(Meeting.id, Format.id)
+            .join(Format, Format.snapshot_id == Meeting.snapshot_id)
+            .where(
+                Meeting.snapshot_id == snapshot_id,
+                # the per-column INs let both sides use their snapshot_id, bmlt_id index before pairs are matched
+                Meeting.bmlt_id.in_({meeting_bmlt_id for meeting_bmlt_id, _ in chunk}),
+                Format.bmlt_id.in_({format_bmlt_id for _, format_bmlt_id in chunk}),
+                tuple_(Meeting.bmlt_id, Format.bmlt_id).in_(chunk),
+            )
+        )
+        db.execute(insert(MeetingFormat).from_select(["meeting_id", "format_id"], meeting_formats))
+
+
 def create_root_server(db: Session, name: str, url: str) -> RootServer:
     root_server = RootServer(name=name, url=url)
     db.add(root_server)
@@ -73,9 +121,8 @@ def create_root_server(db: Session, name: str, url: str) -> RootServer:
 
 
 def delete_root_server(db: Session, root_server_id: int) -> bool:
-    num_rows = db.query(RootServer).filter(RootServer.id == root_server_id).delete()
-    db.flush()
-    return num_rows != 0
+    result = db.execute(delete(RootServer).where(RootServer.id == root_server_id))
+    return result.rowcount != 0
 
 
 def get_root_server(db: Session, root_server_id: int) -> Optional[RootServer]:
@@ -86,41 +133,34 @@ def get_root_servers(db: Session) -> list[RootServer]:
     return db.query(RootServer).all()
 
 
-def get_service_bodies_by_snapshot(db: Session, snapshot_id: int) -> list[ServiceBody]:
-    return db.query(ServiceBody).filter(snapshot_id == snapshot_id).all()
+def get_service_body_ids_by_snapshot(db: Session, snapshot_id: int) -> dict[int, int]:
+    rows = db.query(ServiceBody.bmlt_id, ServiceBody.id).filter(ServiceBody.snapshot_id == snapshot_id).all()
+    return {bmlt_id: id for bmlt_id, id in rows}
 
 
-def get_formats_by_bmlt_ids(db: Session, snapshot_id: int, bmlt_ids: list[int]) -> list[Format]:
-    return (
-        db.query(Format)
-          .filter(Format.snapshot_id == snapshot_id, Format.bmlt_id.in_(bmlt_ids))
-          .all()
-    )
+def get_formats_by_snapshot(db: Session, snapshot_id: int) -> list[Format]:
+    return db.query(Format).filter(Format.snapshot_id == snapshot_id).all()
 
 
-def get_service_body_naws_code_by_server(db: Session, root_server_id: int, bmlt_id: int) -> Optional[ServiceBodyNawsCode]:
-    return (
-        db.query(ServiceBodyNawsCode)
-          .filter(ServiceBodyNawsCode.root_server_id == root_server_id, ServiceBodyNawsCode.bmlt_id == bmlt_id)
-          .first()
-    )
+def _get_naws_codes_by_bmlt_ids(db: Session, model: type[NawsCodeT], root_server_id: int, bmlt_ids: list[int]) -> list[NawsCodeT]:
+    naws_codes = []
+    # keep each IN clause a reasonable size for large root servers
+    for i in range(0, len(bmlt_ids), 1000):
+        naws_codes.extend(
+            db.query(model)
+              .filter(model.root_server_id == root_server_id, model.bmlt_id.in_(bmlt_ids[i:i + 1000]))
+              .all()
+        )
+    return naws_codes
 
 
-def get_format_naws_code_by_server(db: Session, root_server_id: int, bmlt_id: int) -> Optional[FormatNawsCode]:
-    return (
-        db.query(FormatNawsCode)
-          .filter(FormatNawsCode.root_server_id == root_server_id, FormatNawsCode.bmlt_id == bmlt_id)
-          .first()
-    )
+def get_service_body_naws_codes_by_bmlt_ids(db: Session, root_server_id: int, bmlt_ids: list[int]) -> list[ServiceBodyNawsCode]:
+    return _get_naws_codes_by_bmlt_ids(db, ServiceBodyNawsCode, root_server_id, bmlt_ids)
 
 
-def get_meeting_naws_codes_by_server(db: Session, root_server_id: int) -> list[MeetingNawsCode]:
-    return db.query(MeetingNawsCode).filter(MeetingNawsCode.root_server_id == root_server_id).all()
+def get_format_naws_codes_by_bmlt_ids(db: Session, root_server_id: int, bmlt_ids: list[int]) -> list[FormatNawsCode]:
+    return _get_naws_codes_by_bmlt_ids(db, FormatNawsCode, root_server_id, bmlt_ids)
 
 
-def get_meeting_naws_code_by_server(db: Session, root_server_id: int, bmlt_id: int) -> Optional[MeetingNawsCode]:
-    return (
-        db.query(MeetingNawsCode)
-          .filter(MeetingNawsCode.root_server_id == root_server_id, MeetingNawsCode.bmlt_id == bmlt_id)
-          .first()
-    )
+def get_meeting_naws_codes_by_bmlt_ids(db: Session, root_server_id: int, bmlt_ids: list[int]) -> list[MeetingNawsCode]:
+    return _get_naws_codes_by_bmlt_ids(db, MeetingNawsCode, root_server_id, bmlt_ids)
@@ -16,11 +16,17 @@ def get_db_url():
     db_host = settings.get("DBHOST", "0.0.0.0")
     db_port = settings.get("DBPORT", 3306)
     db_name = settings.get("DBNAME", "dijon")
-    return f"mysql+mysqlconnector://{db_user}:{db_pass}@{db_host}:{db_port}/{db_name}"
+    return f"mysql+mysqldb://{db_user}:{db_pass}@{db_host}:{db_port}/{db_name}"
 
 
-engine = create_engine(get_db_url())
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+engine = create_engine(
+    get_db_url(),
+    pool_size=settings.get("DBPOOLSIZE", 20),
+    max_overflow=settings.get("DBMAXOVERFLOW", 40),
+    pool_pre_ping=True,
+    pool_recycle=settings.get("DBPOOLRECYCLE", 1800),
+)
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
 
 
 @contextmanager
@@ -1,9 +1,18 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
 
 from dijon.routers import root_servers
+from dijon.settings import get_list
 
 
-app = FastAPI()
-app.add_middleware(CORSMiddleware, allow_origins=["*"], allow_methods=["*"], allow_headers=["*"])
+app = FastAPI(default_response_class=ORJSONResponse)
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=get_list("CORSORIGINS", ["*"]),
+    allow_methods=["GET", "POST", "DELETE"],
+    allow_headers=get_list("CORSHEADERS", ["*"]),
+)
+app.add_middleware(GZipMiddleware, minimum_size=1024)
 app.include_router(root_servers.router)
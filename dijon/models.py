@@ -1,17 +1,18 @@
 import enum
 
 from sqlalchemy import (
-    DECIMAL,
     Boolean,
+    CheckConstraint,
     Column,
     DateTime,
-    Enum,
+    Float,
     ForeignKey,
+    Index,
     Integer,
-    Interval,
+    SmallInteger,
     String,
     Text,
-    Time,
+    TypeDecorator,
     func,
 )
 from sqlalchemy.orm import relationship
@@ -36,24 +37,43 @@ class DayOfWeekEnum(enum.IntEnum):
     SATURDAY = 7
 
 
+class IntEnumType(TypeDecorator):
+    """Stores an enum.IntEnum as its integer value and loads it back as the enum member"""
+    impl = SmallInteger
+    cache_ok = True
+
+    def __init__(self, enum_class: type[enum.IntEnum], *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # public and named after the __init__ argument so it is part of the statement cache key
+        self.enum_class = enum_class
+
+    def process_bind_param(self, value, dialect):
+        return None if value is None else int(value)
+
+    def process_result_value(self, value, dialect):
+        return None if value is None else self.enum_class(value)
+
+
 class ServiceBodyNawsCode(Base):
     __tablename__ = "service_body_naws_codes"
+    __table_args__ = (Index("ix_service_body_naws_codes_root_server_id_bmlt_id", "root_server_id", "bmlt_id"),)
 
     id = Column(Integer, primary_key=True, index=True)
     root_server_id = Column(ForeignKey("root_servers.id"), nullable=False)
-    root_server = relationship("RootServer", uselist=False)
+    root_server = relationship("RootServer", uselist=False, lazy="select")
     bmlt_id = Column(Integer, nullable=False)
 
 
 class ServiceBody(Base):
     __tablename__ = "service_bodies"
+    __table_args__ = (Index("ix_service_bodies_snapshot_id_bmlt_id", "snapshot_id", "bmlt_id"),)
 
     id = Column(Integer, primary_key=True, index=True)
     snapshot_id = Column(ForeignKey("snapshots.id", ondelete="CASCADE"), nullable=False)
-    snapshot = relationship("Snapshot", uselist=False)
+    snapshot = relationship("Snapshot", uselist=False, lazy="select")
     bmlt_id = Column(Integer, nullable=False)
     parent_id = Column(ForeignKey("service_bodies.id"), nullable=True)
-    parent = relationship("ServiceBody", remote_side=[id])
+    parent = relationship("ServiceBody", remote_side=[id], lazy="select")
     name = Column(String(255), nullable=False)
     type = Column(String(20), nullable=False)
     description = Column(Text, nullable=True)
@@ -61,43 +81,48 @@ class ServiceBody(Base):
     helpline = Column(String(255), nullable=True)
     world_id = Column(String(20), nullable=True)
     service_body_naws_code_id = Column(ForeignKey("service_body_naws_codes.id"), nullable=True)
-    naws_code = relationship("ServiceBodyNawsCode", uselist=False)
-    meetings = relationship("Meeting", back_populates="service_body")
+    # naws codes are resolved from the identity map during snapshots; readers must selectinload() them
+    naws_code = relationship("ServiceBodyNawsCode", uselist=False, lazy="raise_on_sql")
+    # unbounded collections refuse to lazy load; use selectinload() at the query site if one is needed
+    meetings = relationship("Meeting", back_populates="service_body", lazy="raise")
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
 
 class FormatNawsCode(Base):
     __tablename__ = "format_naws_codes"
+    __table_args__ = (Index("ix_format_naws_codes_root_server_id_bmlt_id", "root_server_id", "bmlt_id"),)
 
     id = Column(Integer, primary_key=True, index=True)
     root_server_id = Column(ForeignKey("root_servers.id"), nullable=False)
-    root_server = relationship("RootServer", uselist=False)
+    root_server = relationship("RootServer", uselist=False, lazy="select")
     bmlt_id = Column(Integer, nullable=False)
 
 
 class Format(Base):
     __tablename__ = "formats"
+    __table_args__ = (Index("ix_formats_snapshot_id_bmlt_id", "snapshot_id", "bmlt_id"),)
 
     id = Column(Integer, primary_key=True, index=True)
     snapshot_id = Column(ForeignKey("snapshots.id", ondelete="CASCADE"), nullable=False)
-    snapshot = relationship("Snapshot", uselist=False)
+    snapshot = relationship("Snapshot", uselist=False, lazy="select")
     bmlt_id = Column(Integer, nullable=False)
     key_string = Column(String(255), nullable=False)
     name = Column(String(255), nullable=True)
     world_id = Column(String(20), nullable=True)
     format_naws_code_id = Column(ForeignKey("format_naws_codes.id"), nullable=True)
-    naws_code = relationship("FormatNawsCode", uselist=False)
+    naws_code = relationship("FormatNawsCode", uselist=False, lazy="raise_on_sql")
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
 
 class MeetingNawsCode(Base):
     __tablename__ = "meeting_naws_codes"
+    __table_args__ = (Index("ix_meeting_naws_codes_root_server_id_bmlt_id", "root_server_id", "bmlt_id"),)
 
     id = Column(Integer, primary_key=True, index=True)
     root_server_id = Column(ForeignKey("root_servers.id", ondelete="CASCADE"), nullable=False)
-    root_server = relationship("RootServer", uselist=False)
+    root_server = relationship("RootServer", uselist=False, lazy="select")
     bmlt_id = Column(Integer, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -105,26 +130,34 @@ class MeetingNawsCode(Base):
 
 class Meeting(Base):
     __tablename__ = "meetings"
+    __table_args__ = (
+        Index("ix_meetings_snapshot_id_bmlt_id", "snapshot_id", "bmlt_id"),
+        CheckConstraint("day BETWEEN 1 AND 7", name="ck_meetings_day"),
+        CheckConstraint("venue_type BETWEEN 0 AND 3", name="ck_meetings_venue_type"),
+        CheckConstraint("start_time_minutes BETWEEN 0 AND 1439", name="ck_meetings_start_time_minutes"),
+        CheckConstraint("duration_minutes >= 0", name="ck_meetings_duration_minutes"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     snapshot_id = Column(ForeignKey("snapshots.id"), nullable=False)
-    snapshot = relationship("Snapshot", uselist=False)
+    snapshot = relationship("Snapshot", uselist=False, lazy="select")
     bmlt_id = Column(Integer, nullable=False)
     name = Column(String(255), nullable=False)
-    day = Column(Enum(DayOfWeekEnum), nullable=False)
+    day = Column(IntEnumType(DayOfWeekEnum), nullable=False)
     service_body_id = Column(ForeignKey("service_bodies.id"), nullable=False)
-    service_body = relationship("ServiceBody", back_populates="meetings", uselist=False)
-    venue_type = Column(Enum(VenueTypeEnum), nullable=False)
-    start_time = Column(Time, nullable=False)
-    duration = Column(Interval, nullable=False)
+    service_body = relationship("ServiceBody", back_populates="meetings", uselist=False, lazy="select")
+    venue_type = Column(IntEnumType(VenueTypeEnum), nullable=False)
+    # minutes since midnight, and length in minutes
+    start_time_minutes = Column(SmallInteger, nullable=False)
+    duration_minutes = Column(SmallInteger, nullable=False)
     time_zone = Column(String(255), nullable=True)
-    latitude = Column(DECIMAL(precision=15, scale=12, asdecimal=True), nullable=True)
-    longitude = Column(DECIMAL(precision=15, scale=12, asdecimal=True), nullable=True)
+    latitude = Column(Float(precision=53), nullable=True)
+    longitude = Column(Float(precision=53), nullable=True)
     published = Column(Boolean, nullable=False)
     world_id = Column(String(20), nullable=True)
-    meeting_formats = relationship("MeetingFormat", back_populates="meeting", cascade="all, delete", passive_deletes=True)
+    meeting_formats = relationship("MeetingFormat", back_populates="meeting", cascade="all, delete", passive_deletes=True, lazy="selectin")
     meeting_naws_code_id = Column(ForeignKey("meeting_naws_codes.id"), nullable=True)
-    naws_code = relationship("MeetingNawsCode", uselist=False)
+    naws_code = relationship("MeetingNawsCode", uselist=False, lazy="raise_on_sql")
     location_text = Column(Text, nullable=True)
     location_info = Column(Text, nullable=True)
     location_street = Column(Text, nullable=True)
@@ -151,8 +184,8 @@ class MeetingFormat(Base):
 
     meeting_id = Column(ForeignKey("meetings.id", ondelete="CASCADE"), primary_key=True)
     format_id = Column(ForeignKey("formats.id", ondelete="CASCADE"), primary_key=True)
-    meeting = relationship("Meeting", back_populates="meeting_formats", uselist=False)
-    format = relationship("Format", uselist=False)
+    meeting = relationship("Meeting", back_populates="meeting_formats", uselist=False, lazy="select")
+    format = relationship("Format", uselist=False, lazy="joined")
 
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -164,6 +197,7 @@ class RootServer(Base):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(255), nullable=False)
     url = Column(String(255), nullable=False)
+    snapshots = relationship("Snapshot", back_populates="root_server", passive_deletes=True, lazy="raise")
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
@@ -173,6 +207,6 @@ class Snapshot(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     root_server_id = Column(ForeignKey("root_servers.id", ondelete="CASCADE"), nullable=False)
-    root_server = relationship("RootServer", uselist=False)
+    root_server = relationship("RootServer", back_populates="snapshots", uselist=False, lazy="select")
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
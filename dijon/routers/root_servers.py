@@ -23,8 +23,6 @@ def get_root_server(root_server_id: int, ctx: Context = Depends()):
 
 @router.post("/rootservers", response_model=schemas.RootServer, status_code=HTTP_201_CREATED)
 def create_root_server(root_server: schemas.RootServerCreate, ctx: Context = Depends()):
-    if not root_server.url.endswith("/"):
-        root_server.url += "/"
     return crud.create_root_server(ctx.db, root_server.name, root_server.url)
 
 
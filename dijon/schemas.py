@@ -1,4 +1,4 @@
-from pydantic import AnyHttpUrl, BaseModel, constr
+from pydantic import AnyHttpUrl, BaseModel, constr, validator
 
 
 # Root Server
@@ -6,7 +6,6 @@ from pydantic import AnyHttpUrl, BaseModel, constr
 #
 class RootServerBase(BaseModel):
     name: constr(min_length=1, max_length=255)
-    url: AnyHttpUrl
 
     class Config:
         orm_mode = True
@@ -14,7 +13,15 @@ class RootServerBase(BaseModel):
 
 class RootServer(RootServerBase):
     id: int
+    # urls are validated on the way in, so don't pay to parse them again on the way out
+    url: str
 
 
 class RootServerCreate(RootServerBase):
-    pass
+    url: AnyHttpUrl
+
+    @validator("url")
+    def url_trailing_slash(cls, v):
+        if not v.endswith("/"):
+            return v + "/"
+        return v
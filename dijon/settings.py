@@ -2,3 +2,11 @@ from dynaconf import Dynaconf
 
 
 settings = Dynaconf()
+
+
+def get_list(key: str, default: list[str]) -> list[str]:
+    value = settings.get(key, default)
+    if isinstance(value, str):
+        # a plain env value, e.g. DYNACONF_CORSORIGINS=https://a.org,https://b.org
+        return [item.strip() for item in value.split(",") if item.strip()]
+    return list(value)
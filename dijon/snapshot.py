@@ -1,64 +1,117 @@
 import logging
-from datetime import time, timedelta
-from decimal import Decimal, InvalidOperation
-from typing import Any, Optional
-from urllib.parse import urljoin
+import math
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Any, Optional, TypeVar
 
+import orjson
 import requests
 from pydantic import BaseModel, Field, conint, constr, validator
+from pydantic.datetime_parse import parse_duration, parse_time
 from pydantic.validators import str_validator
+from requests.adapters import HTTPAdapter
 from sqlalchemy.orm import Session
+from urllib3.util.retry import Retry
 
 from dijon import crud, models
 
 
 logger = logging.getLogger(__name__)
 
+BaseModelT = TypeVar("BaseModelT", bound=BaseModel)
+
+# plain dict lookups are much cheaper than calling the enum class once per meeting
+DAYS_OF_WEEK = {day.value: day for day in models.DayOfWeekEnum}
+VENUE_TYPES = {venue_type.value: venue_type for venue_type in models.VenueTypeEnum}
+
+SERVICE_BODIES_ENDPOINT = "client_interface/json/?switcher=GetServiceBodies"
+FORMATS_ENDPOINT = "client_interface/json/?switcher=GetFormats"
+MEETINGS_ENDPOINT = "client_interface/json/?switcher=GetSearchResults&advanced_published=0"
+
+# Shared across snapshots so requests to a root server reuse pooled keep-alive connections
+http_session = requests.Session()
+# This is just a random user agent that doesn't seem to get blocked by webhosts
+http_session.headers.update({'User-Agent': 'Mozilla/5.0 (X11; Linux x86_64; rv:52.0) Gecko/20100101 Firefox/52.0 +dijon'})
+http_adapter = HTTPAdapter(pool_maxsize=8, max_retries=Retry(total=3, backoff_factor=0.3))
+http_session.mount("http://", http_adapter)
+http_session.mount("https://", http_adapter)
+
 
 class SnapshotCache:
     def __init__(self, db: Session, snapshot: models.Snapshot):
         self._db = db
         self._snapshot = snapshot
-        self._service_bodies: Optional[dict[int, models.ServiceBody]] = None
-        self._meeting_naws_codes: Optional[dict[int, models.MeetingNawsCode]] = None
+        self._service_body_ids: Optional[dict[int, int]] = None
+        self._service_body_naws_codes: dict[int, models.ServiceBodyNawsCode] = {}
+        self._formats: Optional[dict[int, models.Format]] = None
+        self._format_naws_codes: dict[int, models.FormatNawsCode] = {}
+        self._meeting_naws_codes: dict[int, models.MeetingNawsCode] = {}
 
     @property
     def snapshot(self) -> models.Snapshot:
         return self._snapshot
 
     @property
-    def service_bodies(self) -> dict[int, models.ServiceBody]:
-        if self._service_bodies is None:
-            db_sbs = crud.get_service_bodies_by_snapshot(self._db, self._snapshot.id)
-            db_sb_dict = {db_sb.bmlt_id: db_sb for db_sb in db_sbs}
-            self._service_bodies = db_sb_dict
-        return self._service_bodies
+    def service_body_ids(self) -> dict[int, int]:
+        if self._service_body_ids is None:
+            # meetings only need the foreign key, so skip building ServiceBody instances
+            self._service_body_ids = crud.get_service_body_ids_by_snapshot(self._db, self._snapshot.id)
+        return self._service_body_ids
 
     @property
-    def meeting_naws_codes(self) -> dict[int, models.MeetingNawsCode]:
-        if self._meeting_naws_codes is None:
-            db_naws_codes = crud.get_meeting_naws_codes_by_server(self._db, self._snapshot.root_server_id)
-            db_naws_codes_dict = {db_naws_code.bmlt_id: db_naws_code for db_naws_code in db_naws_codes}
-            self._meeting_naws_codes = db_naws_codes_dict
-        return self._meeting_naws_codes
+    def formats(self) -> dict[int, models.Format]:
+        if self._formats is None:
+            db_formats = crud.get_formats_by_snapshot(self._db, self._snapshot.id)
+            db_formats_dict = {db_format.bmlt_id: db_format for db_format in db_formats}
+            self._formats = db_formats_dict
+        return self._formats
+
+    def prefetch_service_body_naws_codes(self, bmlt_ids: list[int]):
+        # only the codes for these bmlt_ids are looked up; any other service body gets no code
+        db_naws_codes = crud.get_service_body_naws_codes_by_bmlt_ids(self._db, self._snapshot.root_server_id, bmlt_ids)
+        self._service_body_naws_codes = {db_naws_code.bmlt_id: db_naws_code for db_naws_code in db_naws_codes}
+
+    def prefetch_format_naws_codes(self, bmlt_ids: list[int]):
+        db_naws_codes = crud.get_format_naws_codes_by_bmlt_ids(self._db, self._snapshot.root_server_id, bmlt_ids)
+        self._format_naws_codes = {db_naws_code.bmlt_id: db_naws_code for db_naws_code in db_naws_codes}
 
-    def get_service_body(self, bmlt_id: int) -> Optional[models.ServiceBody]:
-        return self.service_bodies.get(bmlt_id)
+    def prefetch_meeting_naws_codes(self, bmlt_ids: list[int]):
+        # Most root servers only have NAWS codes for some of their meetings, so load just the ones we'll look up
+        db_naws_codes = crud.get_meeting_naws_codes_by_bmlt_ids(self._db, self._snapshot.root_server_id, bmlt_ids)
+        self._meeting_naws_codes = {db_naws_code.bmlt_id: db_naws_code for db_naws_code in db_naws_codes}
+
+    def get_service_body_id(self, bmlt_id: int) -> Optional[int]:
+        return self.service_body_ids.get(bmlt_id)
+
+    def get_formats(self, bmlt_ids: list[int]) -> list[models.Format]:
+        return [self.formats[bmlt_id] for bmlt_id in dict.fromkeys(bmlt_ids) if bmlt_id in self.formats]
+
+    def get_service_body_naws_code(self, bmlt_id: int) -> Optional[models.ServiceBodyNawsCode]:
+        return self._service_body_naws_codes.get(bmlt_id)
+
+    def get_format_naws_code(self, bmlt_id: int) -> Optional[models.FormatNawsCode]:
+        return self._format_naws_codes.get(bmlt_id)
 
     def get_meeting_naws_code(self, bmlt_id: int) -> Optional[models.MeetingNawsCode]:
-        return self.meeting_naws_codes.get(bmlt_id)
+        return self._meeting_naws_codes.get(bmlt_id)
 
     def clear(self):
-        self._service_bodies = None
-        self._meeting_naws_codes = None
+        self._service_body_ids = None
+        self._formats = None
+        self._service_body_naws_codes = {}
+        self._format_naws_codes = {}
+        self._meeting_naws_codes = {}
 
 
 class EmptyToNoneStr(str):
     """A str type that converts empty strings to None"""
     @classmethod
     def __get_validators__(cls):
-        yield str_validator
-        yield lambda s: None if s == '' else s
+        yield cls.validate
+
+    @classmethod
+    def validate(cls, v):
+        return str_validator(v) or None
 
 
 class BmltServiceBody(BaseModel):
@@ -73,22 +126,15 @@ class BmltServiceBody(BaseModel):
 
     @classmethod
     def from_url(cls, url: str) -> list["BmltServiceBody"]:
-        service_bodies = []
-        url = urljoin(url, "client_interface/json/?switcher=GetServiceBodies")
-        for raw in get_json(url):
-            try:
-                obj = cls(**raw)
-            except ValueError:
-                # TODO report this somewhere
-                continue
-            else:
-                service_bodies.append(obj)
-        return service_bodies
-
-    def to_db(self, db: Session, snapshot: models.Snapshot) -> models.ServiceBody:
-        naws_code = crud.get_service_body_naws_code_by_server(db, snapshot.root_server_id, self.id)
-        return models.ServiceBody(
-            snapshot_id=snapshot.id,
+        return parse_valid(cls, get_json(endpoint_url(url, SERVICE_BODIES_ENDPOINT)))
+
+    def to_db(self, cache: SnapshotCache) -> models.ServiceBody:
+        return models.ServiceBody(**self.to_db_dict(cache))
+
+    def to_db_dict(self, cache: SnapshotCache) -> dict[str, Any]:
+        naws_code = cache.get_service_body_naws_code(self.id)
+        return dict(
+            snapshot_id=cache.snapshot.id,
             bmlt_id=self.id,
             parent_id=None,
             name=self.name,
@@ -109,22 +155,15 @@ class BmltFormat(BaseModel):
 
     @classmethod
     def from_url(cls, url: str) -> list["BmltFormat"]:
-        formats = []
-        url = urljoin(url, "client_interface/json/?switcher=GetFormats")
-        for raw in get_json(url):
-            try:
-                obj = cls(**raw)
-            except ValueError:
-                # TODO report this somewhere
-                continue
-            else:
-                formats.append(obj)
-        return formats
-
-    def to_db(self, db: Session, snapshot: models.Snapshot) -> models.Format:
-        naws_code = crud.get_format_naws_code_by_server(db, snapshot.root_server_id, self.id)
-        return models.Format(
-            snapshot_id=snapshot.id,
+        return parse_valid(cls, get_json(endpoint_url(url, FORMATS_ENDPOINT)))
+
+    def to_db(self, cache: SnapshotCache) -> models.Format:
+        return models.Format(**self.to_db_dict(cache))
+
+    def to_db_dict(self, cache: SnapshotCache) -> dict[str, Any]:
+        naws_code = cache.get_format_naws_code(self.id)
+        return dict(
+            snapshot_id=cache.snapshot.id,
             bmlt_id=self.id,
             key_string=self.key_string,
             name=self.name_string,
@@ -139,13 +178,15 @@ class BmltMeeting(BaseModel):
     weekday_tinyint: conint(ge=1, le=7)
     worldid_mixed: Optional[EmptyToNoneStr]
     service_body_bigint: int
-    start_time: time
-    duration_time: timedelta
+    # both kept as whole minutes, which is all BMLT's HH:MM:SS values ever carry
+    start_time: conint(ge=0, le=1439)
+    # stored as SMALLINT minutes, so anything longer is bogus and would overflow the column
+    duration_time: conint(ge=0, le=32767)
     venue_type: Optional[conint(ge=1, le=3)]
     time_zone: Optional[EmptyToNoneStr]
     format_shared_id_list: Optional[list[int]] = Field(default_factory=list)
-    longitude: Optional[Decimal]
-    latitude: Optional[Decimal]
+    longitude: Optional[float]
+    latitude: Optional[float]
     comments: Optional[EmptyToNoneStr]
     virtual_meeting_additional_info: Optional[EmptyToNoneStr]
     location_city_subsection: Optional[EmptyToNoneStr]
@@ -166,33 +207,32 @@ class BmltMeeting(BaseModel):
 
     @classmethod
     def from_url(cls, url: str) -> list["BmltMeeting"]:
-        meetings = []
-        url = urljoin(url, "client_interface/json/?switcher=GetSearchResults&advanced_published=0")
-        for raw in get_json(url):
-            try:
-                obj = cls(**raw)
-            except ValueError:
-                # TODO report this somewhere
-                continue
-            else:
-                meetings.append(obj)
-        return meetings
-
-    def to_db(self, db: Session, cache: SnapshotCache) -> tuple[models.Meeting, list[models.MeetingFormat]]:
+        return parse_valid(cls, get_json(endpoint_url(url, MEETINGS_ENDPOINT)))
+
+    def to_db(self, cache: SnapshotCache) -> tuple[models.Meeting, list[models.MeetingFormat]]:
+        db_meeting = models.Meeting(**self.to_db_dict(cache))
+        db_formats = cache.get_formats(self.format_shared_id_list)
+        db_meeting_formats = [models.MeetingFormat(meeting=db_meeting, format=db_format) for db_format in db_formats]
+        return db_meeting, db_meeting_formats
+
+    def to_db_dict(self, cache: SnapshotCache) -> dict[str, Any]:
         naws_code = cache.get_meeting_naws_code(self.id_bigint)
-        service_body = cache.get_service_body(self.service_body_bigint)
-        if not service_body:
+        service_body_id = cache.get_service_body_id(self.service_body_bigint)
+        if service_body_id is None:
             raise ValueError("invalid service body")
+        day = DAYS_OF_WEEK.get(self.weekday_tinyint)
+        if day is None:
+            raise ValueError("invalid weekday")
 
-        db_meeting = models.Meeting(
+        return dict(
             snapshot_id=cache.snapshot.id,
             bmlt_id=self.id_bigint,
             name=self.meeting_name,
-            day=models.DayOfWeekEnum(self.weekday_tinyint),
-            service_body_id=service_body.id,
-            venue_type=models.VenueTypeEnum(self.venue_type) if self.venue_type else models.VenueTypeEnum.NONE,
-            start_time=self.start_time,
-            duration=self.duration_time,
+            day=day,
+            service_body_id=service_body_id,
+            venue_type=VENUE_TYPES.get(self.venue_type, models.VenueTypeEnum.NONE),
+            start_time_minutes=self.start_time,
+            duration_minutes=self.duration_time,
             time_zone=self.time_zone,
             meeting_naws_code_id=naws_code.id if naws_code else None,
             latitude=self.latitude,
@@ -217,109 +257,151 @@ class BmltMeeting(BaseModel):
             virtual_meeting_additional_info=self.virtual_meeting_additional_info
         )
 
-        db_formats = crud.get_formats_by_bmlt_ids(db, cache.snapshot.id, self.format_shared_id_list)
-        db_meeting_formats = [models.MeetingFormat(meeting=db_meeting, format=db_format) for db_format in db_formats]
-        return db_meeting, db_meeting_formats
-
     @validator("format_shared_id_list", pre=True)
     def format_shared_id_list_pre(cls, v):
         if v is None:
             return []
         if not isinstance(v, str):
             raise ValueError()
+        return split_int_csv(v)
+
+    @validator("start_time", pre=True)
+    def start_time_pre(cls, v):
+        hms = split_hhmmss(v)
+        if hms and hms[0] < 24 and hms[1] < 60 and hms[2] < 60:
+            return hms[0] * 60 + hms[1]
+        # anything else goes through pydantic's own parsing and errors
+        t = parse_time(v)
+        return t.hour * 60 + t.minute
+
+    @validator("duration_time", pre=True)
+    def duration_time_pre(cls, v):
+        hms = split_hhmmss(v)
+        if hms:
+            return hms[0] * 60 + hms[1]
+        return int(parse_duration(v).total_seconds()) // 60
+
+    @validator("longitude", "latitude", pre=True)
+    def coordinate_pre(cls, v):
+        # unset will be empty string, which is most meetings for some servers, so skip the exception
         if v == "":
-            return []
-        return [s.strip() for s in v.split(",")]
-
-    @validator("longitude", pre=True)
-    def longitude_pre(cls, v):
-        # unset will be unparseable empty string
-        try:
-            Decimal(v)
-        except InvalidOperation:
             return None
-        else:
-            return v
-
-    @validator("latitude", pre=True)
-    def latitude_pre(cls, v):
-        # unset will be unparseable empty string
         try:
-            Decimal(v)
-        except InvalidOperation:
+            f = float(v)
+        except (TypeError, ValueError):
             return None
-        else:
-            return v
+        # nan and inf (including overflow like "1e400") can't be stored in a DOUBLE column
+        return f if math.isfinite(f) else None
 
     @validator("venue_type", pre=True)
     def venue_type_pre(cls, v):
-        # unset venue_type will be unparseable empty string
+        # unset venue_type will be empty string
+        if v == "":
+            return None
         try:
             return int(v)
         except ValueError:
             return None
 
 
+@lru_cache(maxsize=16384)
+def split_int_csv(v: str) -> tuple[int, ...]:
+    """Splits a comma separated id list, memoized since many meetings share the same format list"""
+    # int() already tolerates surrounding whitespace
+    return tuple(int(i) for i in v.split(",")) if v else ()
+
+
+def split_hhmmss(v: Any) -> Optional[tuple[int, int, int]]:
+    """Splits BMLT's fixed HH:MM:SS times without the regex pydantic uses for general time strings"""
+    if isinstance(v, str) and len(v) == 8 and v[2] == ":" and v[5] == ":":
+        h, m, s = v[0:2], v[3:5], v[6:8]
+        if h.isdigit() and m.isdigit() and s.isdigit():
+            return int(h), int(m), int(s)
+    return None
+
+
+def parse_valid(model: type[BaseModelT], raws: list[dict[str, Any]]) -> list[BaseModelT]:
+    objs = []
+    for raw in raws:
+        try:
+            objs.append(model(**raw))
+        except ValueError:
+            # TODO report this somewhere
+            continue
+    return objs
+
+
+def endpoint_url(root_server_url: str, endpoint: str) -> str:
+    return f"{root_server_url.rstrip('/')}/{endpoint}"
+
+
 def get_json(url: str) -> list[Any]:
-    # This is just a random user agent that doesn't seem to get blocked by webhosts
-    headers = {'User-Agent': 'Mozilla/5.0 (X11; Linux x86_64; rv:52.0) Gecko/20100101 Firefox/52.0 +dijon'}
-    response = requests.get(url, headers=headers)
+    response = http_session.get(url, timeout=30)
     if response.status_code != 200:
         raise Exception(f"Unexpected status code {response.status_code} GET {url}")
-    return response.json()
+    return orjson.loads(response.content)
 
 
 def create_snapshot(db: Session, root_server: models.RootServer):
     logger.info(f"creating snapshot for {root_server.id}:{root_server.url}...")
+
+    # The three requests are independent, so fetch them concurrently and only then start writing
+    logger.info("getting service bodies, formats, and meetings...")
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        service_bodies_future = executor.submit(BmltServiceBody.from_url, root_server.url)
+        formats_future = executor.submit(BmltFormat.from_url, root_server.url)
+        meetings_future = executor.submit(BmltMeeting.from_url, root_server.url)
+    bmlt_service_bodies = service_bodies_future.result()
+    bmlt_formats = formats_future.result()
+    bmlt_meetings = meetings_future.result()
+
     snapshot = crud.create_snapshot(db, root_server)
+    cache = SnapshotCache(db, snapshot)
 
-    logger.info("getting service bodies...")
-    bmlt_service_bodies = BmltServiceBody.from_url(root_server.url)
     logger.info(f"saving {len(bmlt_service_bodies)} service bodies...")
-    save_service_bodies(db, snapshot, bmlt_service_bodies)
+    save_service_bodies(db, cache, bmlt_service_bodies)
 
-    logger.info("getting formats...")
-    bmlt_formats = BmltFormat.from_url(root_server.url)
     logger.info(f"saving {len(bmlt_formats)} formats...")
-    save_formats(db, snapshot, bmlt_formats)
+    save_formats(db, cache, bmlt_formats)
 
-    logger.info("getting meetings...")
-    bmlt_meetings = BmltMeeting.from_url(root_server.url)
     logger.info(f"saving {len(bmlt_meetings)} meetings...")
-    save_meetings(db, snapshot, bmlt_meetings)
+    save_meetings(db, cache, bmlt_meetings)
 
 
-def save_service_bodies(db: Session, snapshot: models.Snapshot, bmlt_service_bodies: list[BmltServiceBody]):
-    for bmlt_sb in bmlt_service_bodies:
-        db_sb = bmlt_sb.to_db(db, snapshot)
-        db.add(db_sb)
-    db.flush()
+def save_service_bodies(db: Session, cache: SnapshotCache, bmlt_service_bodies: list[BmltServiceBody]):
+    cache.prefetch_service_body_naws_codes([bmlt_sb.id for bmlt_sb in bmlt_service_bodies])
+    crud.create_service_bodies_bulk(db, [bmlt_sb.to_db_dict(cache) for bmlt_sb in bmlt_service_bodies])
 
-    for bmlt_sb in bmlt_service_bodies:
-        if bmlt_sb.parent_id:
-            db_sb_parent = (
-                db.query(models.ServiceBody)
-                  .filter(models.ServiceBody.snapshot_id == snapshot.id, models.ServiceBody.bmlt_id == bmlt_sb.parent_id)
-                  .first()
-            )
-            if db_sb_parent:
-                (db.query(models.ServiceBody)
-                   .filter(models.ServiceBody.snapshot_id == snapshot.id, models.ServiceBody.bmlt_id == bmlt_sb.id)
-                   .update({models.ServiceBody.parent_id: db_sb_parent.id}))
-    db.flush()
+    sb_ids = crud.get_service_body_ids_by_snapshot(db, cache.snapshot.id)
+    parent_rows = [
+        {"b_id": sb_ids[bmlt_sb.id], "b_parent_id": sb_ids[bmlt_sb.parent_id]}
+        for bmlt_sb in bmlt_service_bodies
+        if bmlt_sb.parent_id in sb_ids
+    ]
+    crud.update_service_body_parents(db, parent_rows)
+    # drop anything cached before these rows existed so the meetings phase sees them
+    cache.clear()
 
 
-def save_formats(db: Session, snapshot: models.Snapshot, bmlt_formats: list[BmltFormat]):
-    for bmlt_format in bmlt_formats:
-        db_format = bmlt_format.to_db(db, snapshot)
-        db.add(db_format)
-    db.flush()
+def save_formats(db: Session, cache: SnapshotCache, bmlt_formats: list[BmltFormat]):
+    cache.prefetch_format_naws_codes([bmlt_format.id for bmlt_format in bmlt_formats])
+    crud.create_formats_bulk(db, [bmlt_format.to_db_dict(cache) for bmlt_format in bmlt_formats])
+    cache.clear()
 
 
-def save_meetings(db: Session, snapshot: models.Snapshot, bmlt_meetings: list[BmltMeeting]):
-    cache = SnapshotCache(db, snapshot)
+def save_meetings(db: Session, cache: SnapshotCache, bmlt_meetings: list[BmltMeeting]):
+    # a meeting listed more than once by the root server is only stored once, first one wins
+    unique_meetings: dict[int, BmltMeeting] = {}
     for bmlt_meeting in bmlt_meetings:
-        db_meeting, db_meeting_formats = bmlt_meeting.to_db(db, cache)
-        db.add(db_meeting)
-        db.add_all(db_meeting_formats)
-    db.flush()
+        unique_meetings.setdefault(bmlt_meeting.id_bigint, bmlt_meeting)
+    bmlt_meetings = list(unique_meetings.values())
+
+    cache.prefetch_meeting_naws_codes(list(unique_meetings))
+    crud.create_meetings_bulk(db, [bmlt_meeting.to_db_dict(cache) for bmlt_meeting in bmlt_meetings])
+
+    bmlt_id_pairs = [
+        (bmlt_meeting.id_bigint, format_bmlt_id)
+        for bmlt_meeting in bmlt_meetings
+        for format_bmlt_id in bmlt_meeting.format_shared_id_list
+    ]
+    crud.create_meeting_formats_by_bmlt_ids(db, cache.snapshot.id, bmlt_id_pairs)
@@ -1,33 +1,27 @@
+from typing import Any
+
 import pytest
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
-from dijon import crud
-from dijon.models import Format, FormatNawsCode, RootServer, Snapshot
-from dijon.snapshot import BmltFormat, save_formats
-
-
-@pytest.fixture
-def root_server_1(db: Session) -> RootServer:
-    return crud.create_root_server(db, "root name", "https://blah/main_server/")
+from dijon.models import Format, FormatNawsCode, Snapshot
+from dijon.snapshot import BmltFormat, SnapshotCache, save_formats
 
 
-@pytest.fixture
-def snapshot_1(db: Session, root_server_1: RootServer) -> Snapshot:
-    return crud.create_snapshot(db, root_server_1)
+MOCK_RAW_FORMAT: dict[str, str] = {
+    "key_string": "BEG",
+    "name_string": "Beginners",
+    "description_string": "This meeting is focused on the needs of new members of NA.",
+    "lang": "en",
+    "id": "1",
+    "world_id": "BEG",
+    "root_server_uri": "https://bmlt.sezf.org/main_server",
+    "format_type_enum": "FC3"
+}
 
 
 def get_mock_raw_format() -> dict[str, str]:
-    return {
-        "key_string": "BEG",
-        "name_string": "Beginners",
-        "description_string": "This meeting is focused on the needs of new members of NA.",
-        "lang": "en",
-        "id": "1",
-        "world_id": "BEG",
-        "root_server_uri": "https://bmlt.sezf.org/main_server",
-        "format_type_enum": "FC3"
-    }
+    return MOCK_RAW_FORMAT.copy()
 
 
 def get_mock_bmlt_format() -> BmltFormat:
@@ -95,85 +89,71 @@ def test_parse_raw_format_world_id():
     assert bmlt_format.world_id is None
 
 
-def test_bmlt_format_to_db_bmlt_id(db: Session, snapshot_1: Snapshot):
+@pytest.mark.parametrize("bmlt_field,value,db_field", [
+    ("id", 123, "bmlt_id"),
+    ("key_string", "O", "key_string"),
+])
+def test_bmlt_format_to_db_required_field(db: Session, cache: SnapshotCache, bmlt_field: str, value: Any, db_field: str):
     bmlt_format = get_mock_bmlt_format()
-    bmlt_format.id = 123
-    db_format = bmlt_format.to_db(db, snapshot_1)
-    assert db_format.bmlt_id == 123
-    db.add(db_format)
-    db.flush()
-
-    with pytest.raises(IntegrityError):
-        bmlt_format.id = None
-        db_sb = bmlt_format.to_db(db, snapshot_1)
-        db.add(db_sb)
+    setattr(bmlt_format, bmlt_field, value)
+    db_format = bmlt_format.to_db(cache)
+    assert getattr(db_format, db_field) == value
+
+    # the failed flush only rolls back its own SAVEPOINT
+    with pytest.raises(IntegrityError), db.begin_nested():
+        setattr(bmlt_format, bmlt_field, None)
+        db.add(bmlt_format.to_db(cache))
         db.flush()
 
 
-def test_bmlt_format_to_db_key_string(db: Session, snapshot_1: Snapshot):
-    bmlt_format = get_mock_bmlt_format()
-    bmlt_format.key_string = "O"
-    db_format = bmlt_format.to_db(db, snapshot_1)
-    assert db_format.key_string == "O"
-    db.add(db_format)
-    db.flush()
-
-    with pytest.raises(IntegrityError):
-        bmlt_format.key_string = None
-        db_sb = bmlt_format.to_db(db, snapshot_1)
-        db.add(db_sb)
-        db.flush()
-
-
-def test_bmlt_format_to_db_name(db: Session, snapshot_1: Snapshot):
+def test_bmlt_format_to_db_name(cache: SnapshotCache):
     bmlt_format = get_mock_bmlt_format()
     bmlt_format.name_string = "Open"
-    db_format = bmlt_format.to_db(db, snapshot_1)
+    db_format = bmlt_format.to_db(cache)
     assert db_format.name == "Open"
-    db.add(db_format)
-    db.flush()
 
     bmlt_format.name_string = None
-    db_sb = bmlt_format.to_db(db, snapshot_1)
-    db.add(db_sb)
-    db.flush()
+    db_format = bmlt_format.to_db(cache)
+    assert db_format.name is None
 
 
-def test_bmlt_format_to_db_world_id(db: Session, snapshot_1: Snapshot):
+def test_bmlt_format_to_db_world_id(cache: SnapshotCache):
     bmlt_format = get_mock_bmlt_format()
     bmlt_format.world_id = "BEG"
-    db_format = bmlt_format.to_db(db, snapshot_1)
+    db_format = bmlt_format.to_db(cache)
     assert db_format.world_id == "BEG"
-    db.add(db_format)
-    db.flush()
 
     bmlt_format.world_id = None
-    db_sb = bmlt_format.to_db(db, snapshot_1)
-    db.add(db_sb)
+    db_format = bmlt_format.to_db(cache)
+    assert db_format.world_id is None
+
+
+def test_bmlt_format_to_db_nullable_fields(db: Session, cache: SnapshotCache):
+    bmlt_format = get_mock_bmlt_format()
+    bmlt_format.name_string = None
+    bmlt_format.world_id = None
+    db.add(bmlt_format.to_db(cache))
     db.flush()
 
 
-def test_bmlt_format_to_db_naws_code(db: Session, snapshot_1: Snapshot):
+def test_bmlt_format_to_db_naws_code(db: Session, cache: SnapshotCache):
     bmlt_format = get_mock_bmlt_format()
-    db_format = bmlt_format.to_db(db, snapshot_1)
+    db_format = bmlt_format.to_db(cache)
     assert db_format.format_naws_code_id is None
-    db.add(db_format)
-    db.flush()
 
-    naws_code = FormatNawsCode(root_server_id=snapshot_1.root_server_id, bmlt_id=bmlt_format.id)
+    naws_code = FormatNawsCode(root_server_id=cache.snapshot.root_server_id, bmlt_id=bmlt_format.id)
     db.add(naws_code)
     db.flush()
-    db.refresh(naws_code)
 
-    db_sb = bmlt_format.to_db(db, snapshot_1)
+    cache.prefetch_format_naws_codes([bmlt_format.id])
+    db_sb = bmlt_format.to_db(cache)
     db.add(db_sb)
     db.flush()
-    db.refresh(db_sb)
     assert db_sb.format_naws_code_id == naws_code.id
     assert db_sb.naws_code == naws_code
 
 
-def test_save_formats(db: Session, snapshot_1: Snapshot):
+def test_save_formats(db: Session, snapshot_1: Snapshot, cache: SnapshotCache):
     bmlt_format_1 = get_mock_bmlt_format()
     bmlt_format_1.id = 1
     bmlt_format_1.key_string = "O"
@@ -195,5 +175,34 @@ def test_save_formats(db: Session, snapshot_1: Snapshot):
         bmlt_format_3
     ]
 
-    save_formats(db, snapshot_1, bmlt_formats)
+    save_formats(db, cache, bmlt_formats)
     assert db.query(Format).filter(Format.snapshot == snapshot_1).count() == 3
+
+
+def test_save_formats_naws_codes(db: Session, snapshot_1: Snapshot, cache: SnapshotCache):
+    naws_code = FormatNawsCode(root_server_id=snapshot_1.root_server_id, bmlt_id=2)
+    db.add(naws_code)
+    db.flush()
+
+    bmlt_format_1 = get_mock_bmlt_format()
+    bmlt_format_1.id = 1
+
+    bmlt_format_2 = get_mock_bmlt_format()
+    bmlt_format_2.id = 2
+
+    save_formats(db, cache, [bmlt_format_1, bmlt_format_2])
+    db_format_1 = db.query(Format).filter(Format.snapshot == snapshot_1, Format.bmlt_id == 1).one()
+    assert db_format_1.format_naws_code_id is None
+    db_format_2 = db.query(Format).filter(Format.snapshot == snapshot_1, Format.bmlt_id == 2).one()
+    assert db_format_2.format_naws_code_id == naws_code.id
+
+
+def test_save_formats_refreshes_cache(db: Session, snapshot_1: Snapshot, cache: SnapshotCache):
+    assert cache.get_formats([1]) == []
+
+    bmlt_format = get_mock_bmlt_format()
+    bmlt_format.id = 1
+    save_formats(db, cache, [bmlt_format])
+
+    db_format = db.query(Format).filter(Format.snapshot == snapshot_1, Format.bmlt_id == 1).one()
+    assert cache.get_formats([1]) == [db_format]
@@ -1,354 +1,222 @@
-from typing import Optional
+from typing import Any
 
 import pytest
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
 from dijon import crud
-from dijon.models import RootServer, ServiceBody, ServiceBodyNawsCode, Snapshot
-from dijon.snapshot import BmltServiceBody, save_service_bodies
+from dijon.models import ServiceBody, ServiceBodyNawsCode, Snapshot
+from dijon.snapshot import BmltServiceBody, SnapshotCache, save_service_bodies
 
 
-@pytest.fixture
-def root_server_1(db: Session) -> RootServer:
-    return crud.create_root_server(db, "root name", "https://blah/main_server/")
-
-
-@pytest.fixture
-def snapshot_1(db: Session, root_server_1: RootServer) -> Snapshot:
-    return crud.create_snapshot(db, root_server_1)
+MOCK_RAW_SERVICE_BODY: dict[str, str] = {
+    "id": "9",
+    "parent_id": "20",
+    "name": "Unity Springs Area",
+    "description": "Unity Springs Area",
+    "type": "AS",
+    "url": "http://www.unityspringsna.org",
+    "helpline": "(866) 418-1683",
+    "world_id": "AR63340"
+}
 
 
 def get_mock_raw_service_body() -> dict[str, str]:
-    return {
-        "id": "9",
-        "parent_id": "20",
-        "name": "Unity Springs Area",
-        "description": "Unity Springs Area",
-        "type": "AS",
-        "url": "http://www.unityspringsna.org",
-        "helpline": "(866) 418-1683",
-        "world_id": "AR63340"
-    }
-
-
-def get_mock_bmlt_service_body() -> BmltServiceBody:
-    raw_sb = get_mock_raw_service_body()
-    return BmltServiceBody(**raw_sb)
-
-
-def test_parse_raw_service_body_id():
-    mock_sb = get_mock_raw_service_body()
-    mock_sb["id"] = "123"
-    bmlt_sb = BmltServiceBody(**mock_sb)
-    assert bmlt_sb.id == 123
+    return MOCK_RAW_SERVICE_BODY.copy()
 
-    with pytest.raises(ValueError):
-        mock_sb["id"] = ""
-        BmltServiceBody(**mock_sb)
 
-    with pytest.raises(ValueError):
-        del mock_sb["id"]
-        BmltServiceBody(**mock_sb)
+MOCK_BMLT_SERVICE_BODY = BmltServiceBody(**MOCK_RAW_SERVICE_BODY)
 
 
-def test_parse_raw_service_body_parent_id():
-    mock_sb = get_mock_raw_service_body()
-    mock_sb["parent_id"] = "123"
-    bmlt_sb = BmltServiceBody(**mock_sb)
-    assert bmlt_sb.parent_id == 123
-
-    with pytest.raises(ValueError):
-        mock_sb["parent_id"] = ""
-        BmltServiceBody(**mock_sb)
-
-    with pytest.raises(ValueError):
-        del mock_sb["parent_id"]
-        BmltServiceBody(**mock_sb)
-
-
-def test_parse_raw_service_body_name():
-    mock_sb = get_mock_raw_service_body()
-    mock_sb["name"] = "Georgia Region"
-    bmlt_sb = BmltServiceBody(**mock_sb)
-    assert bmlt_sb.name == "Georgia Region"
-
-    with pytest.raises(ValueError):
-        mock_sb["name"] = ""
-        BmltServiceBody(**mock_sb)
-
-    with pytest.raises(ValueError):
-        del mock_sb["name"]
-        BmltServiceBody(**mock_sb)
+def get_mock_bmlt_service_body() -> BmltServiceBody:
+    # tests only reassign fields, so a shallow copy is enough to isolate them
+    return MOCK_BMLT_SERVICE_BODY.copy()
 
 
-def test_parse_raw_service_body_type():
+@pytest.mark.parametrize("field,raw,parsed", [
+    ("id", "123", 123),
+    ("parent_id", "123", 123),
+    ("name", "Georgia Region", "Georgia Region"),
+    ("type", "AS", "AS"),
+])
+def test_parse_raw_service_body_required(field: str, raw: str, parsed: Any):
     mock_sb = get_mock_raw_service_body()
-    mock_sb["type"] = "AS"
+    mock_sb[field] = raw
     bmlt_sb = BmltServiceBody(**mock_sb)
-    assert bmlt_sb.type == "AS"
+    assert getattr(bmlt_sb, field) == parsed
 
-    with pytest.raises(ValueError):
-        mock_sb["type"] = ""
+    # match the error's own line so "id" doesn't also accept a parent_id failure
+    with pytest.raises(ValueError, match=f"(?m)^{field}$"):
+        mock_sb[field] = ""
         BmltServiceBody(**mock_sb)
 
-    with pytest.raises(ValueError):
-        del mock_sb["type"]
+    with pytest.raises(ValueError, match=f"(?m)^{field}$"):
+        del mock_sb[field]
         BmltServiceBody(**mock_sb)
 
 
-def test_parse_raw_service_body_url():
+@pytest.mark.parametrize("field,value", [
+    ("url", "https://blah"),
+    ("helpline", "5555555555"),
+    ("description", "long description"),
+    ("world_id", "AR63340"),
+])
+def test_parse_raw_service_body_optional_string(field: str, value: str):
     mock_sb = get_mock_raw_service_body()
-    mock_sb["url"] = "https://blah"
+    mock_sb[field] = value
     bmlt_sb = BmltServiceBody(**mock_sb)
-    assert bmlt_sb.url == "https://blah"
+    assert getattr(bmlt_sb, field) == value
 
-    mock_sb["url"] = ""
+    mock_sb[field] = ""
     bmlt_sb = BmltServiceBody(**mock_sb)
-    assert bmlt_sb.url is None
+    assert getattr(bmlt_sb, field) is None
 
-    del mock_sb["url"]
+    del mock_sb[field]
     bmlt_sb = BmltServiceBody(**mock_sb)
-    assert bmlt_sb.url is None
+    assert getattr(bmlt_sb, field) is None
 
 
-def test_parse_raw_service_body_helpline():
-    mock_sb = get_mock_raw_service_body()
-    mock_sb["helpline"] = "5555555555"
-    bmlt_sb = BmltServiceBody(**mock_sb)
-    assert bmlt_sb.helpline == "5555555555"
-
-    mock_sb["helpline"] = ""
-    bmlt_sb = BmltServiceBody(**mock_sb)
-    assert bmlt_sb.helpline is None
-
-    del mock_sb["helpline"]
-    bmlt_sb = BmltServiceBody(**mock_sb)
-    assert bmlt_sb.helpline is None
-
-
-def test_parse_raw_service_body_description():
-    mock_sb = get_mock_raw_service_body()
-    mock_sb["description"] = "long description"
-    bmlt_sb = BmltServiceBody(**mock_sb)
-    assert bmlt_sb.description == "long description"
-
-    mock_sb["description"] = ""
-    bmlt_sb = BmltServiceBody(**mock_sb)
-    assert bmlt_sb.description is None
-
-    del mock_sb["description"]
-    bmlt_sb = BmltServiceBody(**mock_sb)
-    assert bmlt_sb.description is None
-
-
-def test_parse_raw_service_body_world_id():
-    mock_sb = get_mock_raw_service_body()
-    mock_sb["world_id"] = "AR63340"
-    bmlt_sb = BmltServiceBody(**mock_sb)
-    assert bmlt_sb.world_id == "AR63340"
-
-    mock_sb["world_id"] = ""
-    bmlt_sb = BmltServiceBody(**mock_sb)
-    assert bmlt_sb.world_id is None
-
-    del mock_sb["world_id"]
-    bmlt_sb = BmltServiceBody(**mock_sb)
-    assert bmlt_sb.world_id is None
-
-
-def test_bmlt_service_body_to_db_bmlt_id(db: Session, snapshot_1: Snapshot):
+@pytest.mark.parametrize("bmlt_field,value,db_field", [
+    ("id", 123, "bmlt_id"),
+    ("name", "cool name", "name"),
+    ("type", "AS", "type"),
+])
+def test_bmlt_service_body_to_db_required_field(db: Session, cache: SnapshotCache, bmlt_field: str, value: Any, db_field: str):
     bmlt_sb = get_mock_bmlt_service_body()
-    bmlt_sb.id = 123
-    db_sb = bmlt_sb.to_db(db, snapshot_1)
-    assert db_sb.bmlt_id == 123
-    db.add(db_sb)
-    db.flush()
-
-    with pytest.raises(IntegrityError):
-        bmlt_sb.id = None
-        db_sb = bmlt_sb.to_db(db, snapshot_1)
-        db.add(db_sb)
+    setattr(bmlt_sb, bmlt_field, value)
+    db_sb = bmlt_sb.to_db(cache)
+    assert getattr(db_sb, db_field) == value
+
+    # the failed flush only rolls back its own SAVEPOINT
+    with pytest.raises(IntegrityError), db.begin_nested():
+        setattr(bmlt_sb, bmlt_field, None)
+        db.add(bmlt_sb.to_db(cache))
         db.flush()
 
 
-def test_bmlt_service_body_to_db_bmlt_parent_id(db: Session, snapshot_1: Snapshot):
+def test_bmlt_service_body_to_db_bmlt_parent_id(cache: SnapshotCache):
     bmlt_sb = get_mock_bmlt_service_body()
-    db_sb = bmlt_sb.to_db(db, snapshot_1)
+    db_sb = bmlt_sb.to_db(cache)
     assert db_sb.parent_id is None
-    db.add(db_sb)
-    db.flush()
-
-
-def test_bmlt_service_body_to_db_bmlt_name(db: Session, snapshot_1: Snapshot):
-    bmlt_sb = get_mock_bmlt_service_body()
-    bmlt_sb.name = "cool name"
-    db_sb = bmlt_sb.to_db(db, snapshot_1)
-    assert db_sb.name == "cool name"
-    db.add(db_sb)
-    db.flush()
-
-    with pytest.raises(IntegrityError):
-        bmlt_sb.name = None
-        db_sb = bmlt_sb.to_db(db, snapshot_1)
-        db.add(db_sb)
-        db.flush()
-
-
-def test_bmlt_service_body_to_db_type(db: Session, snapshot_1: Snapshot):
-    bmlt_sb = get_mock_bmlt_service_body()
-    bmlt_sb.type = "AS"
-    db_sb = bmlt_sb.to_db(db, snapshot_1)
-    assert db_sb.type == "AS"
-    db.add(db_sb)
-    db.flush()
-
-    with pytest.raises(IntegrityError):
-        bmlt_sb.type = None
-        db_sb = bmlt_sb.to_db(db, snapshot_1)
-        db.add(db_sb)
-        db.flush()
 
 
-def test_bmlt_service_body_to_db_description(db: Session, snapshot_1: Snapshot):
+def test_bmlt_service_body_to_db_description(cache: SnapshotCache):
     bmlt_sb = get_mock_bmlt_service_body()
     bmlt_sb.description = "cool desc"
-    db_sb = bmlt_sb.to_db(db, snapshot_1)
+    db_sb = bmlt_sb.to_db(cache)
     assert db_sb.description == "cool desc"
-    db.add(db_sb)
-    db.flush()
 
     bmlt_sb.description = None
-    db_sb = bmlt_sb.to_db(db, snapshot_1)
+    db_sb = bmlt_sb.to_db(cache)
     assert db_sb.description is None
-    db.add(db_sb)
-    db.flush()
 
 
-def test_bmlt_service_body_to_db_url(db: Session, snapshot_1: Snapshot):
+def test_bmlt_service_body_to_db_url(cache: SnapshotCache):
     bmlt_sb = get_mock_bmlt_service_body()
     bmlt_sb.url = "https://blah"
-    db_sb = bmlt_sb.to_db(db, snapshot_1)
+    db_sb = bmlt_sb.to_db(cache)
     assert db_sb.url == "https://blah"
-    db.add(db_sb)
-    db.flush()
 
     bmlt_sb.url = None
-    db_sb = bmlt_sb.to_db(db, snapshot_1)
+    db_sb = bmlt_sb.to_db(cache)
     assert db_sb.url is None
-    db.add(db_sb)
-    db.flush()
 
 
-def test_bmlt_service_body_to_db_helpline(db: Session, snapshot_1: Snapshot):
+def test_bmlt_service_body_to_db_helpline(cache: SnapshotCache):
     bmlt_sb = get_mock_bmlt_service_body()
     bmlt_sb.helpline = "5555555555"
-    db_sb = bmlt_sb.to_db(db, snapshot_1)
+    db_sb = bmlt_sb.to_db(cache)
     assert db_sb.helpline == "5555555555"
-    db.add(db_sb)
-    db.flush()
 
     bmlt_sb.helpline = None
-    db_sb = bmlt_sb.to_db(db, snapshot_1)
+    db_sb = bmlt_sb.to_db(cache)
     assert db_sb.helpline is None
-    db.add(db_sb)
-    db.flush()
 
 
-def test_bmlt_service_body_to_db_world_id(db: Session, snapshot_1: Snapshot):
+def test_bmlt_service_body_to_db_world_id(cache: SnapshotCache):
     bmlt_sb = get_mock_bmlt_service_body()
     bmlt_sb.world_id = "AR63340"
-    db_sb = bmlt_sb.to_db(db, snapshot_1)
+    db_sb = bmlt_sb.to_db(cache)
     assert db_sb.world_id == "AR63340"
-    db.add(db_sb)
-    db.flush()
 
     bmlt_sb.world_id = None
-    db_sb = bmlt_sb.to_db(db, snapshot_1)
+    db_sb = bmlt_sb.to_db(cache)
     assert db_sb.world_id is None
-    db.add(db_sb)
+
+
+def test_bmlt_service_body_to_db_nullable_fields(db: Session, cache: SnapshotCache):
+    bmlt_sb = get_mock_bmlt_service_body()
+    bmlt_sb.description = None
+    bmlt_sb.url = None
+    bmlt_sb.helpline = None
+    bmlt_sb.world_id = None
+    db.add(bmlt_sb.to_db(cache))
     db.flush()
 
 
-def test_bmlt_service_body_to_db_naws_code(db: Session, snapshot_1: Snapshot):
+def test_bmlt_service_body_to_db_naws_code(db: Session, cache: SnapshotCache):
     bmlt_sb = get_mock_bmlt_service_body()
-    db_sb = bmlt_sb.to_db(db, snapshot_1)
+    db_sb = bmlt_sb.to_db(cache)
     assert db_sb.service_body_naws_code_id is None
-    db.add(db_sb)
-    db.flush()
 
-    naws_code = ServiceBodyNawsCode(root_server_id=snapshot_1.root_server_id, bmlt_id=bmlt_sb.id)
+    naws_code = ServiceBodyNawsCode(root_server_id=cache.snapshot.root_server_id, bmlt_id=bmlt_sb.id)
     db.add(naws_code)
     db.flush()
-    db.refresh(naws_code)
 
-    db_sb = bmlt_sb.to_db(db, snapshot_1)
+    cache.prefetch_service_body_naws_codes([bmlt_sb.id])
+    db_sb = bmlt_sb.to_db(cache)
     db.add(db_sb)
     db.flush()
-    db.refresh(db_sb)
     assert db_sb.service_body_naws_code_id == naws_code.id
     assert db_sb.naws_code == naws_code
 
 
-def test_save_service_bodies(db: Session, snapshot_1: Snapshot):
-    bmlt_sb_1 = get_mock_bmlt_service_body()
-    bmlt_sb_1.id = 1
-    bmlt_sb_1.parent_id = 0
-
-    bmlt_sb_2 = get_mock_bmlt_service_body()
-    bmlt_sb_2.id = 2
-    bmlt_sb_2.parent_id = 1
-
-    bmlt_sb_3 = get_mock_bmlt_service_body()
-    bmlt_sb_3.id = 3
-    bmlt_sb_3.parent_id = 1
-
-    bmlt_sb_4 = get_mock_bmlt_service_body()
-    bmlt_sb_4.id = 4
-    bmlt_sb_4.parent_id = 3
-
-    bmlt_sb_5 = get_mock_bmlt_service_body()
-    bmlt_sb_5.id = 5
-    bmlt_sb_5.parent_id = 0
-
-    bmlt_sb_6 = get_mock_bmlt_service_body()
-    bmlt_sb_6.id = 6
-    bmlt_sb_6.parent_id = 5
-
-    bmlt_service_bodies = [
-        bmlt_sb_1,
-        bmlt_sb_2,
-        bmlt_sb_5,
-        bmlt_sb_3,
-        bmlt_sb_4,
-        bmlt_sb_6,
-    ]
+def test_save_service_bodies(db: Session, snapshot_1: Snapshot, cache: SnapshotCache):
+    # (bmlt_id, parent_id) pairs forming two trees rooted at 1 and 5
+    tree = [(1, 0), (2, 1), (3, 1), (4, 3), (5, 0), (6, 5)]
+    bmlt_sbs = {bmlt_id: MOCK_BMLT_SERVICE_BODY.copy(update={"id": bmlt_id, "parent_id": parent_id}) for bmlt_id, parent_id in tree}
+    # the save order interleaves the two trees
+    bmlt_service_bodies = [bmlt_sbs[bmlt_id] for bmlt_id in (1, 2, 5, 3, 4, 6)]
 
-    save_service_bodies(db, snapshot_1, bmlt_service_bodies)
+    save_service_bodies(db, cache, bmlt_service_bodies)
 
-    def get_sb(bmlt_id: int) -> Optional[ServiceBody]:
-        return db.query(ServiceBody).filter(ServiceBody.snapshot_id == snapshot_1.id, ServiceBody.bmlt_id == bmlt_id).first()
+    db_sbs = db.query(ServiceBody).filter(ServiceBody.snapshot_id == snapshot_1.id, ServiceBody.bmlt_id.in_(bmlt_sbs)).all()
+    db_sbs_by_bmlt_id = {db_sb.bmlt_id: db_sb for db_sb in db_sbs}
 
-    db_sb_1 = get_sb(bmlt_sb_1.id)
+    db_sb_1 = db_sbs_by_bmlt_id[1]
     assert db_sb_1.parent_id is None
     assert db_sb_1.parent is None
 
-    db_sb_2 = get_sb(bmlt_sb_2.id)
+    db_sb_2 = db_sbs_by_bmlt_id[2]
     assert db_sb_2.parent_id == db_sb_1.id
     assert db_sb_2.parent == db_sb_1
 
-    db_sb_3 = get_sb(bmlt_sb_3.id)
+    db_sb_3 = db_sbs_by_bmlt_id[3]
     assert db_sb_3.parent_id == db_sb_1.id
     assert db_sb_3.parent == db_sb_1
 
-    db_sb_4 = get_sb(bmlt_sb_4.id)
+    db_sb_4 = db_sbs_by_bmlt_id[4]
     assert db_sb_4.parent_id == db_sb_3.id
     assert db_sb_4.parent == db_sb_3
 
-    db_sb_5 = get_sb(bmlt_sb_5.id)
+    db_sb_5 = db_sbs_by_bmlt_id[5]
     assert db_sb_5.parent_id is None
     assert db_sb_5.parent is None
 
-    db_sb_6 = get_sb(bmlt_sb_6.id)
+    db_sb_6 = db_sbs_by_bmlt_id[6]
     assert db_sb_6.parent_id == db_sb_5.id
     assert db_sb_6.parent == db_sb_5
+
+
+def test_save_service_bodies_unknown_parent(db: Session, snapshot_1: Snapshot, cache: SnapshotCache):
+    # a service body with the parent's bmlt_id in another snapshot must not be linked
+    snapshot_2 = crud.create_snapshot(db, snapshot_1.root_server)
+    crud.create_service_body(db, snapshot_2.id, 1, "sb name", "AS")
+
+    bmlt_sb = get_mock_bmlt_service_body()
+    bmlt_sb.id = 2
+    bmlt_sb.parent_id = 1
+
+    save_service_bodies(db, cache, [bmlt_sb])
+    db_sb = db.query(ServiceBody).filter(ServiceBody.snapshot_id == snapshot_1.id, ServiceBody.bmlt_id == 2).one()
+    assert db_sb.parent_id is None